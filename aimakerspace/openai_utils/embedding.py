@@ -1,17 +1,30 @@
 import asyncio
 import os
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 
 from dotenv import load_dotenv
 from openai import AsyncOpenAI, OpenAI
 
+# OpenAI accepts at most 2048 inputs and 300K tokens per embeddings request.
+# Batches are sized by UTF-8 byte length, which never undercounts tokens, so
+# no tokenizer (and no tokenizer download) is needed to respect the cap.
+MAX_BATCH_SIZE = 2048
+MAX_BATCH_BYTES = 300_000
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 5
+
 
 class EmbeddingModel:
     """Helper for generating embeddings via the OpenAI API."""
 
-    def __init__(self, embeddings_model_name: str = "text-embedding-3-small"):
+    def __init__(
+        self,
+        embeddings_model_name: str = "text-embedding-3-small",
+        async_client: Optional[AsyncOpenAI] = None,
+        api_key: Optional[str] = None,
+    ):
         load_dotenv()
-        self.openai_api_key = os.getenv("OPENAI_API_KEY")
+        self.openai_api_key = api_key or os.getenv("OPENAI_API_KEY")
         if self.openai_api_key is None:
             raise ValueError(
                 "OPENAI_API_KEY environment variable is not set. "
@@ -19,17 +32,33 @@ class EmbeddingModel:
             )
 
         self.embeddings_model_name = embeddings_model_name
-        self.async_client = AsyncOpenAI()
-        self.client = OpenAI()
+        # The SDK retries 429s with exponential backoff and honours Retry-After.
+        if async_client is not None:
+            self.async_client = async_client.with_options(max_retries=MAX_RETRIES)
+        else:
+            self.async_client = AsyncOpenAI(
+                api_key=self.openai_api_key, max_retries=MAX_RETRIES
+            )
+        self.client = OpenAI(api_key=self.openai_api_key, max_retries=MAX_RETRIES)
 
     async def async_get_embeddings(self, list_of_text: Iterable[str]) -> List[List[float]]:
-        """Return embeddings for ``list_of_text`` using the async client."""
+        """Return embeddings for ``list_of_text`` using the async client.
 
-        embedding_response = await self.async_client.embeddings.create(
-            input=list(list_of_text), model=self.embeddings_model_name
-        )
+        Inputs are split into request-sized batches that are sent concurrently.
+        """
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                embedding_response = await self.async_client.embeddings.create(
+                    input=batch, model=self.embeddings_model_name
+                )
+            return [item.embedding for item in embedding_response.data]
 
-        return [item.embedding for item in embedding_response.data]
+        batches = await asyncio.to_thread(self._batches, list_of_text)
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return [embedding for batch in results for embedding in batch]
 
     async def async_get_embedding(self, text: str) -> List[float]:
         """Return an embedding for a single text using the async client."""
@@ -43,11 +72,13 @@ class EmbeddingModel:
     def get_embeddings(self, list_of_text: Iterable[str]) -> List[List[float]]:
         """Return embeddings for ``list_of_text`` using the sync client."""
 
-        embedding_response = self.client.embeddings.create(
-            input=list(list_of_text), model=self.embeddings_model_name
-        )
-
-        return [item.embedding for item in embedding_response.data]
+        embeddings: List[List[float]] = []
+        for batch in self._batches(list_of_text):
+            embedding_response = self.client.embeddings.create(
+                input=batch, model=self.embeddings_model_name
+            )
+            embeddings.extend(item.embedding for item in embedding_response.data)
+        return embeddings
 
     def get_embedding(self, text: str) -> List[float]:
         """Return an embedding for a single text using the sync client."""
@@ -58,6 +89,26 @@ class EmbeddingModel:
 
         return embedding.data[0].embedding
 
+    def _batches(self, list_of_text: Iterable[str]) -> List[List[str]]:
+        """Split ``list_of_text`` into batches within the per-request limits."""
+
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_bytes = 0
+        for text in list_of_text:
+            text_bytes = len(text.encode("utf-8"))
+            if batch and (
+                len(batch) >= MAX_BATCH_SIZE
+                or batch_bytes + text_bytes > MAX_BATCH_BYTES
+            ):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(text)
+            batch_bytes += text_bytes
+        if batch:
+            batches.append(batch)
+        return batches
+
 
 if __name__ == "__main__":
     embedding_model = EmbeddingModel()
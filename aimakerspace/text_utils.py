@@ -1,7 +1,7 @@
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, List, Tuple
 
-import PyPDF2
+import pypdfium2 as pdfium
 
 
 class TextFileLoader:
@@ -66,20 +66,22 @@ class CharacterTextSplitter:
 
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self._step = chunk_size - chunk_overlap
 
     def split(self, text: str) -> List[str]:
         """Split ``text`` into chunks preserving the configured overlap."""
 
-        step = self.chunk_size - self.chunk_overlap
-        return [text[i : i + self.chunk_size] for i in range(0, len(text), step)]
+        # Stop before a final chunk that would lie entirely inside the
+        # previous chunk's overlap and add no new text.
+        stop = max(len(text) - self.chunk_overlap, 1) if text else 0
+        return [
+            text[i : i + self.chunk_size] for i in range(0, stop, self._step)
+        ]
 
     def split_texts(self, texts: List[str]) -> List[str]:
         """Split multiple texts and flatten the resulting chunks."""
 
-        chunks: List[str] = []
-        for text in texts:
-            chunks.extend(self.split(text))
-        return chunks
+        return [chunk for text in texts for chunk in self.split(text)]
 
 
 class PDFLoader:
@@ -126,11 +128,40 @@ class PDFLoader:
                 yield self._read_pdf(entry)
 
     def _read_pdf(self, file_path: Path) -> str:
-        with file_path.open("rb") as file_handle:
-            pdf_reader = PyPDF2.PdfReader(file_handle)
-            extracted_pages = [page.extract_text() or "" for page in pdf_reader.pages]
+        # PDFium is not thread-safe, so pages are extracted sequentially.
+        pdf = pdfium.PdfDocument(str(file_path))
+        try:
+            extracted_pages = [self._read_page(page) for page in pdf]
+        finally:
+            pdf.close()
         return "\n".join(extracted_pages)
 
+    def _read_page(self, page: "pdfium.PdfPage") -> str:
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range().replace("\r\n", "\n")
+        finally:
+            textpage.close()
+            page.close()
+
+
+def load_and_split_pdf(
+    path: str, chunk_size: int = 1000, chunk_overlap: int = 200
+) -> Tuple[int, int, List[str]]:
+    """Extract the text of the PDF at ``path`` and split it into chunks.
+
+    Returns the number of documents loaded, their total length in characters
+    and the chunks. Kept free of any web-app imports so that process-pool
+    workers only need this module to run it.
+    """
+
+    pdf_loader = PDFLoader(path)
+    pdf_loader.load_file()
+    total_text_length = sum(len(doc) for doc in pdf_loader.documents)
+    text_splitter = CharacterTextSplitter(chunk_size, chunk_overlap)
+    chunks = text_splitter.split_texts(pdf_loader.documents)
+    return len(pdf_loader.documents), total_text_length, chunks
+
 
 if __name__ == "__main__":
     loader = TextFileLoader("data/KingLear.txt")
@@ -1,10 +1,30 @@
 import asyncio
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
 from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 
+try:
+    import hnswlib
+except ImportError:  # optional: without it every search is brute force
+    hnswlib = None
+
 from aimakerspace.openai_utils.embedding import EmbeddingModel
 
+# Rows of the float16 search matrix upcast to float32 per BLAS call; bounds
+# the temporary copy to a few MB regardless of how many vectors are stored.
+SEARCH_BLOCK_ROWS = 4096
+
+# Below this many vectors brute force beats the HNSW graph traversal.
+HNSW_MIN_VECTORS = 1000
+HNSW_EF_CONSTRUCTION = 200
+HNSW_M = 16
+HNSW_EF_SEARCH = 64
+
 
 def cosine_similarity(vector_a: np.ndarray, vector_b: np.ndarray) -> float:
     """Return the cosine similarity between two vectors."""
@@ -18,17 +38,39 @@ def cosine_similarity(vector_a: np.ndarray, vector_b: np.ndarray) -> float:
     return float(dot_product / (norm_a * norm_b))
 
 
+def l2_normalize(vectors: Iterable[float]) -> np.ndarray:
+    """Return ``vectors`` as float32 scaled to unit length along the last axis."""
+
+    array = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(array, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return array / norms
+
+
 class VectorDatabase:
-    """Minimal in-memory vector store backed by numpy arrays."""
+    """Minimal in-memory vector store backed by numpy arrays.
+
+    Besides the ``vectors`` mapping, the store keeps every vector as an
+    L2-normalized row of one contiguous float16 matrix so that cosine search
+    is a matrix-vector product instead of a Python loop. Vectors added via
+    ``abuild_from_list`` are exposed in ``vectors`` as views of those rows,
+    i.e. normalized and at half precision. When ``hnswlib`` is installed and
+    at least ``HNSW_MIN_VECTORS`` vectors are stored, cosine searches go
+    through an approximate HNSW index instead.
+    """
 
     def __init__(self, embedding_model: Optional[EmbeddingModel] = None):
         self.vectors: Dict[str, np.ndarray] = {}
         self.embedding_model = embedding_model or EmbeddingModel()
+        self._keys: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._index = None
 
     def insert(self, key: str, vector: Iterable[float]) -> None:
         """Store ``vector`` so that it can be retrieved with ``key`` later on."""
 
         self.vectors[key] = np.asarray(vector, dtype=float)
+        self._matrix = None
 
     def search(
         self,
@@ -41,6 +83,9 @@ class VectorDatabase:
         if k <= 0:
             raise ValueError("k must be a positive integer")
 
+        if distance_measure is cosine_similarity:
+            return self._search_matrix(query_vector, k)
+
         query = np.asarray(query_vector, dtype=float)
         scores = [
             (key, distance_measure(query, vector))
@@ -69,14 +114,140 @@ class VectorDatabase:
 
         return self.vectors.get(key)
 
+    def save(self, directory: Union[str, Path]) -> None:
+        """Write the search matrix, keys and HNSW index to ``directory``.
+
+        Files are written to a sibling temporary directory that is renamed
+        into place, so concurrent readers never see a partial save.
+        """
+
+        if self._matrix is None:
+            self._build_matrix()
+        if self._matrix is None:
+            raise ValueError("Cannot save an empty vector database")
+
+        directory = Path(directory)
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=directory.parent))
+        np.save(staging / "matrix.npy", self._matrix)
+        with (staging / "keys.json").open("w", encoding="utf-8") as file_handle:
+            json.dump(self._keys, file_handle)
+        if self._index is not None:
+            self._index.save_index(str(staging / "index.hnsw"))
+        try:
+            os.replace(staging, directory)
+        except OSError:
+            # Another writer saved the same store first; keep theirs.
+            shutil.rmtree(staging, ignore_errors=True)
+            if not directory.is_dir():
+                raise
+
+    def load(self, directory: Union[str, Path]) -> "VectorDatabase":
+        """Replace the contents with a store previously written by :meth:`save`.
+
+        The matrix is memory-mapped rather than read into memory, and a saved
+        HNSW index is loaded as is instead of being rebuilt.
+        """
+
+        directory = Path(directory)
+        with (directory / "keys.json").open("r", encoding="utf-8") as file_handle:
+            keys: List[str] = json.load(file_handle)
+        matrix = np.load(directory / "matrix.npy", mmap_mode="r")
+        if matrix.shape[0] != len(keys):
+            raise ValueError(f"Corrupt vector store at {directory}")
+
+        self._keys = keys
+        self._matrix = matrix
+        self.vectors = dict(zip(keys, matrix))
+        self._index = None
+        index_path = directory / "index.hnsw"
+        if hnswlib is not None and index_path.is_file():
+            index = hnswlib.Index(space="cosine", dim=matrix.shape[1])
+            index.load_index(str(index_path), max_elements=len(keys))
+            index.set_ef(HNSW_EF_SEARCH)
+            self._index = index
+        else:
+            self._build_index(matrix)
+        return self
+
     async def abuild_from_list(self, list_of_text: List[str]) -> "VectorDatabase":
         """Populate the vector store asynchronously from raw text snippets."""
 
         embeddings = await self.embedding_model.async_get_embeddings(list_of_text)
         for text, embedding in zip(list_of_text, embeddings):
             self.insert(text, embedding)
+        # Building the HNSW index takes seconds for large stores; keep it off the loop
+        await asyncio.to_thread(self._build_matrix)
+        # Share storage with the matrix instead of keeping float64 copies
+        self.vectors = dict(zip(self._keys, self._matrix))
         return self
 
+    def _build_matrix(self) -> None:
+        """Stack the stored vectors into the normalized search matrix."""
+
+        self._keys = list(self.vectors)
+        self._index = None
+        if not self._keys:
+            self._matrix = None
+            return
+
+        normalized = l2_normalize(np.vstack([self.vectors[key] for key in self._keys]))
+        self._matrix = np.ascontiguousarray(normalized, dtype=np.float16)
+        self._build_index(normalized)
+
+    def _build_index(self, normalized: np.ndarray) -> None:
+        """Build the HNSW index over ``normalized`` when it pays off."""
+
+        if hnswlib is not None and len(self._keys) >= HNSW_MIN_VECTORS:
+            index = hnswlib.Index(space="cosine", dim=normalized.shape[1])
+            index.init_index(
+                max_elements=len(self._keys),
+                ef_construction=HNSW_EF_CONSTRUCTION,
+                M=HNSW_M,
+            )
+            index.add_items(
+                np.asarray(normalized, dtype=np.float32), np.arange(len(self._keys))
+            )
+            index.set_ef(HNSW_EF_SEARCH)
+            self._index = index
+
+    def _search_matrix(
+        self, query_vector: Iterable[float], k: int
+    ) -> List[Tuple[str, float]]:
+        """Cosine search via the HNSW index or the normalized matrix.
+
+        NumPy has no BLAS kernel for float16, so the matrix is upcast to
+        float32 one block at a time; storage stays at half precision.
+        """
+
+        if self._matrix is None:
+            self._build_matrix()
+        if self._matrix is None:
+            return []
+
+        query = l2_normalize(query_vector)
+        k = min(k, len(self._keys))
+
+        if self._index is not None:
+            labels, distances = self._index.knn_query(query, k=k)
+            return [
+                (self._keys[label], float(1.0 - distance))
+                for label, distance in zip(labels[0], distances[0])
+            ]
+
+        scores = np.empty(len(self._keys), dtype=np.float32)
+        for start in range(0, len(self._keys), SEARCH_BLOCK_ROWS):
+            block = self._matrix[start : start + SEARCH_BLOCK_ROWS]
+            np.matmul(
+                block.astype(np.float32),
+                query,
+                out=scores[start : start + SEARCH_BLOCK_ROWS],
+            )
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._keys[index], float(scores[index])) for index in top]
+
 
 if __name__ == "__main__":
     list_of_text = [
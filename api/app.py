@@ -1,29 +1,94 @@
 # Import required FastAPI components for building the API
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 # Import Pydantic for data validation and settings management
 from pydantic import BaseModel
 # Import OpenAI client for interacting with OpenAI's API
-from openai import OpenAI
+from openai import AsyncOpenAI
+import httpx
 import os
+import re
+import hashlib
+import shutil
+import random
 import asyncio
 import tempfile
 import logging
+import multiprocessing
 import time
-from typing import Optional, Dict, Any, List
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from itertools import islice
+from typing import Optional, Iterable, List, Tuple
 from pathlib import Path
 
+import numpy as np
+import tiktoken
+
 # Import aimakerspace components for RAG functionality
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
-from aimakerspace.text_utils import PDFLoader, CharacterTextSplitter
-from aimakerspace.vectordatabase import VectorDatabase
+from aimakerspace.text_utils import load_and_split_pdf
+from aimakerspace.vectordatabase import VectorDatabase, l2_normalize
 from aimakerspace.openai_utils.embedding import EmbeddingModel
 from aimakerspace.openai_utils.chatmodel import ChatOpenAI
 
-# Initialize FastAPI application with a title
-app = FastAPI(title="RAG PDF Chat API")
+def get_openai_client(api_key: str) -> AsyncOpenAI:
+    """Return an AsyncOpenAI client for ``api_key`` backed by the shared connection pool."""
+    return AsyncOpenAI(api_key=api_key, http_client=app.state.http_client)
+
+# Recently used chat models keyed by (model name, API key digest), so the plaintext key is never a cache key
+CHAT_MODEL_CACHE_SIZE = 8
+_chat_models: "OrderedDict[Tuple[str, str], ChatOpenAI]" = OrderedDict()
+
+def get_chat_model(model_name: str, api_key: str) -> ChatOpenAI:
+    """Return a ChatOpenAI for ``model_name`` and ``api_key``, reusing a recent instance when possible."""
+    key = (model_name, hashlib.blake2s(api_key.encode(), digest_size=8).hexdigest())
+    chat_model = _chat_models.get(key)
+    if chat_model is None:
+        chat_model = ChatOpenAI(
+            model_name=model_name,
+            async_client=get_openai_client(api_key),
+            api_key=api_key
+        )
+        _chat_models[key] = chat_model
+        if len(_chat_models) > CHAT_MODEL_CACHE_SIZE:
+            _chat_models.popitem(last=False)
+    _chat_models.move_to_end(key)
+    return chat_model
+
+def _create_pdf_pool() -> ProcessPoolExecutor:
+    # Spawn fresh workers: forking would copy the running event loop, HTTP client and other threads' locks
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared HTTP/2 connection pool for every OpenAI call, so requests reuse warm TLS connections
+    app.state.http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=60,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    )
+    # Worker processes for PDF parsing, so concurrent uploads use separate cores
+    try:
+        app.state.pdf_pool = _create_pdf_pool()
+    except (OSError, NotImplementedError) as e:
+        logger.warning(f"⚠️ Process pool unavailable, parsing PDFs in threads: {str(e)}")
+    yield
+    if app.state.pdf_pool is not None:
+        app.state.pdf_pool.shutdown(cancel_futures=True)
+        app.state.pdf_pool = None
+    # Cached chat models hold clients bound to the pool that is about to close
+    _chat_models.clear()
+    await app.state.http_client.aclose()
+    app.state.http_client = None
+
+# Initialize FastAPI application with a title; responses are serialized with orjson
+app = FastAPI(title="RAG PDF Chat API", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Configure CORS (Cross-Origin Resource Sharing) middleware
 # This allows the API to be accessed from different domains/origins
@@ -42,9 +107,58 @@ logger = logging.getLogger(__name__)
 # Global state for storing the current PDF's vector database and metadata
 app.state.vector_db: Optional[VectorDatabase] = None
 app.state.pdf_filename: Optional[str] = None
+app.state.pdf_hash: Optional[str] = None  # SHA-256 of the PDF behind vector_db; keys the response caches
 app.state.chunk_count: int = 0
 app.state.is_processing: bool = False
 app.state.processing_step: Optional[str] = None
+app.state.pdf_pool: Optional[ProcessPoolExecutor] = None  # None falls back to the default thread pool
+app.state.http_client: Optional[httpx.AsyncClient] = None  # None lets the OpenAI SDK use its own client
+
+# Preallocated /api/status payload, updated in place whenever the state above changes
+app.state.status_view: dict = {
+    "status": "ok",
+    "has_pdf": False,
+    "pdf_filename": None,
+    "chunk_count": 0,
+    "vector_db_ready": False,
+    "is_processing": False,
+    "processing_step": None,
+}
+
+def _refresh_status_view() -> None:
+    """Copy the current PDF and processing state into ``app.state.status_view`` in place."""
+    view = app.state.status_view
+    view["has_pdf"] = app.state.pdf_filename is not None
+    view["pdf_filename"] = app.state.pdf_filename
+    view["chunk_count"] = app.state.chunk_count
+    view["vector_db_ready"] = app.state.vector_db is not None
+    view["is_processing"] = app.state.is_processing
+    view["processing_step"] = app.state.processing_step
+
+# Uploads are streamed to disk in 1MB pieces and capped at 50MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+
+# Retrieved context is whitespace-collapsed and capped at this many tokens before prompting
+MAX_CONTEXT_TOKENS = 1500
+# Rough English average, used to cap the context in characters when the tokenizer cannot be loaded
+CHARS_PER_TOKEN = 4
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# A numbered ("1.", "10)") or bulleted ("-", "•") list item longer than 10 characters
+_LIST_ITEM_RE = re.compile(r"^\s*(?:\d+[.)]|[-•])\s*(.{11,}?)\s*$")
+
+# Embeddings are persisted per PDF content hash so re-uploads skip parsing and embedding
+VECTOR_CACHE_DIR = Path(os.getenv("VECTOR_CACHE_DIR", Path(tempfile.gettempdir()) / "rag-pdf-vector-cache"))
+# Bump whenever text extraction or chunking changes, so persisted stores from older code are not reused
+VECTOR_CACHE_VERSION = 1
+EMBEDDING_MODEL = "text-embedding-3-small"
+# Least recently used stores are evicted beyond this many bytes (serverless /tmp is small)
+VECTOR_CACHE_MAX_BYTES = int(os.getenv("VECTOR_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+# Exact-match response cache keyed by (pdf_hash, normalized question, model), kept in LRU order
+EXACT_CACHE_SIZE = 512
+app.state.exact_cache: "OrderedDict[Tuple[str, str, str], ChatResponse]" = OrderedDict()
 
 # Define the data model for RAG chat requests using Pydantic
 # This ensures incoming request data is properly validated
@@ -68,12 +182,175 @@ class TopicSuggestionsResponse(BaseModel):
     suggestions: List[str]
     has_pdf: bool
 
-async def process_pdf_and_create_vector_db(pdf_content: bytes, filename: str, api_key: str) -> tuple[VectorDatabase, int]:
+class SemanticCache:
+    """
+    LRU cache of chat responses looked up by question-embedding similarity.
+
+    Cached question embeddings are kept as pre-normalized rows of a single
+    float32 matrix, so a lookup is one matrix-vector product. A hit requires
+    the same PDF content and model and a cosine similarity of at least ``threshold``.
     """
-    Process PDF content and create vector database for RAG.
+
+    def __init__(self, max_entries: int = 256, threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every cached response (e.g. when the PDF changes)."""
+        self._matrix: Optional[np.ndarray] = None
+        self._entries: List[Tuple[str, str, str, ChatResponse]] = []  # (pdf_hash, model, question, response) per row
+        self._last_used: List[int] = []
+        self._clock = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, embedding: List[float], pdf_hash: str, model: str) -> Optional[ChatResponse]:
+        """Return the cached response for the most similar prior question, if any."""
+        if not self._entries:
+            return None
+
+        scores = self._matrix[:len(self._entries)] @ l2_normalize(embedding)
+        for row in np.argsort(scores)[::-1]:
+            if scores[row] < self.threshold:
+                break
+            if self._entries[row][:2] == (pdf_hash, model):
+                self._touch(row)
+                return self._entries[row][3]
+        return None
+
+    def put(
+        self, embedding: List[float], pdf_hash: str, model: str, question: str, response: ChatResponse
+    ) -> None:
+        """Cache ``response``, evicting the least recently used entry when full."""
+        query = l2_normalize(embedding)
+        if self._matrix is None:
+            self._matrix = np.empty((self.max_entries, query.shape[0]), dtype=np.float32)
+
+        if len(self._entries) < self.max_entries:
+            row = len(self._entries)
+            self._entries.append((pdf_hash, model, question, response))
+            self._last_used.append(0)
+        else:
+            row = min(range(len(self._last_used)), key=self._last_used.__getitem__)
+            self._entries[row] = (pdf_hash, model, question, response)
+
+        self._matrix[row] = query
+        self._touch(row)
+
+    def _touch(self, row: int) -> None:
+        self._clock += 1
+        self._last_used[row] = self._clock
+
+# Responses for semantically similar questions about the current PDF
+app.state.semantic_cache = SemanticCache()
+
+def _remember_exact(key: Tuple[str, str, str], response: ChatResponse) -> None:
+    """Store ``response`` in the exact-match cache, evicting the oldest entry when full."""
+    app.state.exact_cache[key] = response
+    app.state.exact_cache.move_to_end(key)
+    if len(app.state.exact_cache) > EXACT_CACHE_SIZE:
+        app.state.exact_cache.popitem(last=False)
+
+@lru_cache(maxsize=1)
+def _prompt_encoding() -> Optional[tiktoken.Encoding]:
+    """Tokenizer for the gpt-4o model family, loaded on first use; None if it cannot be loaded."""
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # tiktoken downloads its BPE file on first use, which fails without network access
+        logger.warning(f"⚠️ Tokenizer unavailable, capping context by characters instead: {str(e)}")
+        return None
+
+def build_context(chunks: List[str]) -> List[str]:
+    """
+    Normalize whitespace in retrieved chunks and keep them within MAX_CONTEXT_TOKENS.
+    
+    Chunks are taken in relevance order; the first one that does not fit is
+    truncated at the token boundary and the rest are dropped. Without a tokenizer
+    the budget is MAX_CONTEXT_TOKENS * CHARS_PER_TOKEN characters instead.
+    """
+    encoding = _prompt_encoding()
+    remaining = MAX_CONTEXT_TOKENS if encoding is not None else MAX_CONTEXT_TOKENS * CHARS_PER_TOKEN
+    context_chunks = []
+    for chunk in chunks:
+        text = _WHITESPACE_RE.sub(" ", chunk).strip()
+        units = encoding.encode_ordinary(text) if encoding is not None else text
+        if not units:
+            continue
+        if len(units) > remaining:
+            if remaining > 0:
+                context_chunks.append(encoding.decode(units[:remaining]) if encoding is not None else units[:remaining])
+            break
+        context_chunks.append(text)
+        remaining -= len(units)
+    return context_chunks
+
+def reservoir_sample(items: Iterable[str], k: int, seed: int = 42) -> List[str]:
+    """
+    Pick ``k`` items uniformly at random in a single pass without materializing ``items``.
+    
+    The sample is shuffled before returning, so any prefix of it is uniform too. A private
+    seeded RNG keeps the results consistent without touching the global random state.
+    """
+    rng = random.Random(seed)
+    iterator = iter(items)
+    sample = list(islice(iterator, k))
+    for i, item in enumerate(iterator, start=k):
+        j = rng.randint(0, i)
+        if j < k:
+            sample[j] = item
+    # Items that were never replaced still sit in document order; shuffle like random.sample
+    rng.shuffle(sample)
+    return sample
+
+def vector_cache_path(content_hash: str) -> Path:
+    """Directory of the persisted store for a PDF, keyed by its content and everything that shapes its vectors."""
+    key = f"{VECTOR_CACHE_VERSION}:{EMBEDDING_MODEL}:{content_hash}"
+    return VECTOR_CACHE_DIR / hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+async def load_cached_vector_db(cache_path: Path, api_key: str) -> Optional[VectorDatabase]:
+    """Return the vector database persisted at ``cache_path``, or None if there is no usable copy."""
+    if not cache_path.is_dir():
+        return None
+    try:
+        embedding_model = EmbeddingModel(EMBEDDING_MODEL, async_client=get_openai_client(api_key), api_key=api_key)
+        vector_db = await asyncio.to_thread(VectorDatabase(embedding_model=embedding_model).load, cache_path)
+    except Exception as e:
+        logger.warning(f"⚠️ Ignoring unreadable persisted embeddings at {cache_path}: {str(e)}")
+        return None
+    try:
+        # Mark the store as recently used so eviction keeps it
+        os.utime(cache_path)
+    except OSError:
+        pass  # evicted by a concurrent save; the loaded copy is still usable
+    return vector_db
+
+def persist_vector_db(vector_db: VectorDatabase, cache_path: Path) -> None:
+    """Save ``vector_db`` at ``cache_path``, then evict least recently used stores over the size cap."""
+    vector_db.save(cache_path)
+    
+    stores = []
+    for store in VECTOR_CACHE_DIR.iterdir():
+        # Skip other uploads' staging directories; finished stores are named by a SHA-256 hex digest
+        if store.is_dir() and len(store.name) == 64:
+            size = sum(entry.stat().st_size for entry in store.iterdir())
+            stores.append((store.stat().st_mtime, size, store))
+    
+    total_size = 0
+    for _, size, store in sorted(stores, reverse=True):
+        total_size += size
+        if total_size > VECTOR_CACHE_MAX_BYTES and store != cache_path:
+            logger.info(f"🧹 Evicting persisted embeddings: {store.name[:12]}")
+            shutil.rmtree(store, ignore_errors=True)
+
+async def process_pdf_and_create_vector_db(pdf_path: str, filename: str, api_key: str) -> tuple[VectorDatabase, int]:
+    """
+    Process a PDF file on disk and create vector database for RAG.
     
     Args:
-        pdf_content: Raw PDF file content as bytes
+        pdf_path: Path to the uploaded PDF file
         filename: Name of the uploaded PDF file
         api_key: OpenAI API key for embeddings
         
@@ -84,75 +361,79 @@ async def process_pdf_and_create_vector_db(pdf_content: bytes, filename: str, ap
         HTTPException: If PDF processing or embedding creation fails
     """
     start_time = time.time()
-    logger.info(f"🚀 Starting PDF processing for: {filename} ({len(pdf_content):,} bytes)")
+    logger.info(f"🚀 Starting PDF processing for: {filename} ({os.path.getsize(pdf_path):,} bytes)")
     
     try:
         # Update processing status
         app.state.is_processing = True
-        app.state.processing_step = "Creating temporary file"
-        logger.info("📁 Creating temporary file for PDF processing")
+        _refresh_status_view()
         
-        # Create temporary file to save PDF content
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
-            temp_file.write(pdf_content)
-            temp_file_path = temp_file.name
+        # Steps 1-2: Load PDF and split into chunks
+        app.state.processing_step = "Loading PDF content and splitting into chunks"
+        _refresh_status_view()
+        logger.info(f"📖 Loading PDF from {pdf_path} and splitting into chunks (1000 chars, 200 overlap)")
         
+        # Parsing and splitting are CPU-bound and hold the GIL; run them in a worker process
+        # (or a worker thread when no process pool is available)
+        loop = asyncio.get_running_loop()
+        pdf_pool = app.state.pdf_pool
         try:
-            # Step 1: Load PDF
-            app.state.processing_step = "Loading PDF content"
-            logger.info(f"📖 Loading PDF from: {temp_file_path}")
-            
-            pdf_loader = PDFLoader(temp_file_path)
-            pdf_loader.load_file()
-            
-            if not pdf_loader.documents:
-                logger.error("❌ Could not extract text from PDF")
-                raise HTTPException(status_code=400, detail="Could not extract text from PDF")
-            
-            total_text_length = sum(len(doc) for doc in pdf_loader.documents)
-            logger.info(f"✅ PDF loaded successfully: {len(pdf_loader.documents)} pages, {total_text_length:,} characters")
-            
-            # Step 2: Split into chunks
-            app.state.processing_step = "Splitting text into chunks"
-            logger.info("✂️ Splitting text into chunks (1000 chars, 200 overlap)")
-            
-            text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-            chunks = text_splitter.split_texts(pdf_loader.documents)
-            
-            if not chunks:
-                logger.error("❌ PDF appears to be empty or unreadable")
-                raise HTTPException(status_code=400, detail="PDF appears to be empty or unreadable")
-            
-            logger.info(f"✅ Text split into {len(chunks)} chunks")
-            
-            # Step 3: Set up embedding model
-            app.state.processing_step = "Setting up OpenAI embedding model"
-            logger.info("🔑 Setting up OpenAI API key and embedding model")
-            
-            os.environ["OPENAI_API_KEY"] = api_key
-            embedding_model = EmbeddingModel()
-            vector_db = VectorDatabase(embedding_model=embedding_model)
-            
-            # Step 4: Generate embeddings (this is the slow part)
-            app.state.processing_step = f"Generating embeddings for {len(chunks)} chunks"
-            logger.info(f"🧠 Generating embeddings for {len(chunks)} chunks (this may take a moment...)")
-            
-            embedding_start = time.time()
-            await vector_db.abuild_from_list(chunks)
-            embedding_time = time.time() - embedding_start
-            
-            logger.info(f"✅ Embeddings generated in {embedding_time:.2f} seconds")
-            
-            total_time = time.time() - start_time
-            logger.info(f"🎉 PDF processing completed in {total_time:.2f} seconds!")
-            logger.info(f"📊 Final stats: {len(chunks)} chunks, {total_text_length:,} characters, ready for RAG queries")
-            
-            return vector_db, len(chunks)
-            
-        finally:
-            # Clean up temporary file
-            logger.info(f"🧹 Cleaning up temporary file: {temp_file_path}")
-            os.unlink(temp_file_path)
+            document_count, total_text_length, chunks = await loop.run_in_executor(
+                pdf_pool, load_and_split_pdf, pdf_path
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. PDFium crashed on a malformed file); replace the pool so later uploads still work
+            logger.error("❌ PDF worker process crashed, restarting the process pool")
+            if app.state.pdf_pool is pdf_pool:
+                pdf_pool.shutdown(wait=False, cancel_futures=True)
+                try:
+                    app.state.pdf_pool = _create_pdf_pool()
+                except (OSError, NotImplementedError) as e:
+                    app.state.pdf_pool = None
+                    logger.warning(f"⚠️ Process pool unavailable, parsing PDFs in threads: {str(e)}")
+            raise HTTPException(status_code=400, detail="Could not parse PDF")
+        
+        if document_count == 0:
+            logger.error("❌ Could not extract text from PDF")
+            raise HTTPException(status_code=400, detail="Could not extract text from PDF")
+        
+        logger.info(f"✅ PDF loaded successfully: {document_count} pages, {total_text_length:,} characters")
+        
+        if not chunks:
+            logger.error("❌ PDF appears to be empty or unreadable")
+            raise HTTPException(status_code=400, detail="PDF appears to be empty or unreadable")
+        
+        logger.info(f"✅ Text split into {len(chunks)} chunks")
+        
+        # Step 3: Set up embedding model
+        app.state.processing_step = "Setting up OpenAI embedding model"
+        _refresh_status_view()
+        logger.info("🔑 Setting up OpenAI embedding model")
+        
+        embedding_model = EmbeddingModel(EMBEDDING_MODEL, async_client=get_openai_client(api_key), api_key=api_key)
+        vector_db = VectorDatabase(embedding_model=embedding_model)
+        
+        # Step 4: Generate embeddings (this is the slow part)
+        # Repeated headers/footers yield identical chunks; the store is keyed by text, so embed each distinct chunk once
+        unique_chunks = list(dict.fromkeys(chunks))
+        if len(unique_chunks) < len(chunks):
+            logger.info(f"♻️ Skipping {len(chunks) - len(unique_chunks)} duplicate chunks")
+        
+        app.state.processing_step = f"Generating embeddings for {len(unique_chunks)} chunks"
+        _refresh_status_view()
+        logger.info(f"🧠 Generating embeddings for {len(unique_chunks)} chunks (this may take a moment...)")
+        
+        embedding_start = time.time()
+        await vector_db.abuild_from_list(unique_chunks)
+        embedding_time = time.time() - embedding_start
+        
+        logger.info(f"✅ Embeddings generated in {embedding_time:.2f} seconds")
+        
+        total_time = time.time() - start_time
+        logger.info(f"🎉 PDF processing completed in {total_time:.2f} seconds!")
+        logger.info(f"📊 Final stats: {len(unique_chunks)} chunks, {total_text_length:,} characters, ready for RAG queries")
+        
+        return vector_db, len(unique_chunks)
             
     except HTTPException:
         app.state.processing_step = None
@@ -166,6 +447,7 @@ async def process_pdf_and_create_vector_db(pdf_content: bytes, filename: str, ap
     finally:
         app.state.processing_step = None
         app.state.is_processing = False
+        _refresh_status_view()
 
 
 @app.post("/api/upload-pdf", response_model=UploadResponse)
@@ -194,53 +476,94 @@ async def upload_pdf(
     if not file.filename or not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
     
-    # Check file size (limit to 50MB)
-    content = await file.read()
-    if len(content) > 50 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size must be less than 50MB")
-    
-    if len(content) == 0:
-        raise HTTPException(status_code=400, detail="Empty file uploaded")
-    
-    logger.info(f"📤 PDF upload received: {file.filename} ({len(content):,} bytes)")
-    
+    temp_file = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    temp_file_path = temp_file.name
+    try:
+        # Stream the upload to the temporary file in 1MB pieces, enforcing the 50MB limit as we go
+        with temp_file:
+            total_size = 0
+            content_hash = hashlib.sha256()
+            while data := await file.read(UPLOAD_CHUNK_SIZE):
+                total_size += len(data)
+                if total_size > MAX_UPLOAD_SIZE:
+                    break
+                temp_file.write(data)
+                content_hash.update(data)
+        
+        if total_size > MAX_UPLOAD_SIZE:
+            raise HTTPException(status_code=400, detail="File size must be less than 50MB")
+        
+        if total_size == 0:
+            raise HTTPException(status_code=400, detail="Empty file uploaded")
+        
+        logger.info(f"📤 PDF upload received: {file.filename} ({total_size:,} bytes)")
+        return await _index_uploaded_pdf(temp_file_path, file.filename, api_key, content_hash.hexdigest())
+    finally:
+        # Clean up temporary file
+        logger.info(f"🧹 Cleaning up temporary file: {temp_file_path}")
+        os.unlink(temp_file_path)
+
+
+async def _index_uploaded_pdf(pdf_path: str, filename: str, api_key: str, content_hash: str) -> UploadResponse:
+    """Replace the current PDF with the one at ``pdf_path`` and index it, reusing a persisted index when available."""
     try:
         # Clear any previous PDF data
         app.state.vector_db = None
+        app.state.pdf_hash = None
         app.state.chunk_count = 0
-        app.state.pdf_filename = file.filename
-        
-        # Process PDF immediately upon upload
-        logger.info("🚀 Starting immediate PDF processing...")
-        vector_db, chunk_count = await process_pdf_and_create_vector_db(
-            content, 
-            file.filename, 
-            api_key
-        )
+        app.state.pdf_filename = filename
+        _refresh_status_view()
+        
+        cache_path = vector_cache_path(content_hash)
+        vector_db = await load_cached_vector_db(cache_path, api_key)
+        if vector_db is not None:
+            chunk_count = len(vector_db.vectors)
+            logger.info(f"♻️ Reusing persisted embeddings for {filename} ({content_hash[:12]})")
+        else:
+            # Process PDF immediately upon upload
+            logger.info("🚀 Starting immediate PDF processing...")
+            vector_db, chunk_count = await process_pdf_and_create_vector_db(
+                pdf_path, 
+                filename, 
+                api_key
+            )
+            
+            try:
+                await asyncio.to_thread(persist_vector_db, vector_db, cache_path)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not persist embeddings to {cache_path}: {str(e)}")
         
-        # Store the processed results
+        # Store the processed results; cached answers belong to whichever store was installed before
         app.state.vector_db = vector_db
+        app.state.pdf_hash = content_hash
         app.state.chunk_count = chunk_count
+        app.state.semantic_cache.clear()
+        app.state.exact_cache.clear()
+        _refresh_status_view()
         
         logger.info(f"✅ PDF upload and processing completed: {chunk_count} chunks ready for queries")
         
         return UploadResponse(
             message=f"PDF processed successfully! {chunk_count} chunks indexed and ready for questions.",
-            filename=file.filename,
+            filename=filename,
             chunk_count=chunk_count
         )
         
     except HTTPException:
         # Reset state on failure
         app.state.vector_db = None
+        app.state.pdf_hash = None
         app.state.pdf_filename = None
         app.state.chunk_count = 0
+        _refresh_status_view()
         raise
     except Exception as e:
         # Reset state on failure
         app.state.vector_db = None
+        app.state.pdf_hash = None
         app.state.pdf_filename = None
         app.state.chunk_count = 0
+        _refresh_status_view()
         logger.error(f"❌ Error uploading/processing PDF: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
 
@@ -267,17 +590,49 @@ async def rag_chat(request: RAGChatRequest):
         # Check if PDF has been processed (should be processed upon upload)
         if app.state.vector_db is None:
             raise HTTPException(status_code=400, detail="PDF not processed yet. Please re-upload the PDF.")
+        
+        # Pin the PDF for this request; an upload may replace app.state.vector_db while we await OpenAI
+        vector_db = app.state.vector_db
+        pdf_hash = app.state.pdf_hash
+        
+        # Repeated identical questions skip embedding, search, and generation entirely
+        exact_key = (pdf_hash, request.question.strip().lower(), request.model)
+        cached_response = app.state.exact_cache.get(exact_key)
+        if cached_response is not None:
+            app.state.exact_cache.move_to_end(exact_key)
+            logger.info("⚡ Exact cache hit, returning stored response")
+            return cached_response
             
+        # Embed the question once; the embedding serves both the cache lookup and the search
+        # (with the requester's key, not the uploader's, and the model the PDF was embedded with)
+        embedding_response = await get_openai_client(request.api_key).embeddings.create(
+            input=request.question,
+            model=vector_db.embedding_model.embeddings_model_name
+        )
+        question_embedding = embedding_response.data[0].embedding
+        
+        cached_response = app.state.semantic_cache.get(question_embedding, pdf_hash, request.model)
+        if cached_response is not None:
+            logger.info("⚡ Semantic cache hit, skipping retrieval and generation")
+            if app.state.vector_db is vector_db:
+                _remember_exact(exact_key, cached_response)
+            return cached_response
+        
         logger.info(f"🔍 Searching for relevant content in {app.state.chunk_count} chunks")
         
         # Retrieve relevant context from vector database
-        relevant_chunks = app.state.vector_db.search_by_text(
-            request.question, 
-            k=3,  # Get top 3 most relevant chunks
-            return_as_text=True
-        )
+        relevant_chunks = [
+            text for text, _ in vector_db.search(
+                question_embedding,
+                k=3,  # Get top 3 most relevant chunks
+            )
+        ]
         
-        if not relevant_chunks:
+        # Construct a token-capped context from relevant chunks
+        # In a worker thread: tokenizing, and on first use loading the tokenizer, would block the loop
+        context_chunks = await asyncio.to_thread(build_context, relevant_chunks)
+        
+        if not context_chunks:
             logger.info("⚠️ No relevant chunks found for question")
             return ChatResponse(
                 answer="I am not sure.",
@@ -285,8 +640,7 @@ async def rag_chat(request: RAGChatRequest):
                 has_pdf=True
             )
         
-        # Construct context from relevant chunks
-        context = "\n\n".join(relevant_chunks)
+        context = "\n\n".join(context_chunks)
         
         # Create RAG prompt that enforces context-only responses
         rag_prompt = f"""You are a helpful assistant that answers questions based ONLY on the provided context from a PDF document. 
@@ -307,20 +661,25 @@ Answer:"""
 
         logger.info("🤖 Generating response using OpenAI")
         
-        # Set OpenAI API key for chat model
-        os.environ["OPENAI_API_KEY"] = request.api_key
-        
         # Generate response using ChatOpenAI
-        chat_model = ChatOpenAI(model_name=request.model)
-        response = chat_model.run([{"role": "user", "content": rag_prompt}])
+        chat_model = get_chat_model(request.model, request.api_key)
+        response = await chat_model.arun([{"role": "user", "content": rag_prompt}])
         
         logger.info(f"✅ Generated response: {response[:100]}{'...' if len(response) > 100 else ''}")
         
-        return ChatResponse(
+        chat_response = ChatResponse(
             answer=response,
-            sources_used=len(relevant_chunks),
+            sources_used=len(context_chunks),
             has_pdf=True
         )
+        # Only cache if the PDF was not replaced or cleared while the answer was generated
+        if app.state.vector_db is vector_db:
+            app.state.semantic_cache.put(
+                question_embedding, pdf_hash, request.model, request.question, chat_response
+            )
+            _remember_exact(exact_key, chat_response)
+        
+        return chat_response
         
     except HTTPException:
         raise
@@ -337,15 +696,8 @@ async def get_status():
     Returns:
         Dict containing current PDF filename, chunk count, processing status, and system status
     """
-    return {
-        "status": "ok",
-        "has_pdf": app.state.pdf_filename is not None,
-        "pdf_filename": app.state.pdf_filename,
-        "chunk_count": app.state.chunk_count,
-        "vector_db_ready": app.state.vector_db is not None,
-        "is_processing": app.state.is_processing,
-        "processing_step": app.state.processing_step
-    }
+    # Serve the preallocated view directly, skipping per-request dict building and validation
+    return ORJSONResponse(app.state.status_view)
 
 
 @app.delete("/api/pdf")
@@ -357,8 +709,12 @@ async def clear_pdf():
         Dict with success message
     """
     app.state.vector_db = None
+    app.state.pdf_hash = None
     app.state.pdf_filename = None
     app.state.chunk_count = 0
+    _refresh_status_view()
+    app.state.semantic_cache.clear()
+    app.state.exact_cache.clear()
     if hasattr(app.state, 'pdf_content'):
         delattr(app.state, 'pdf_content')
     
@@ -390,18 +746,13 @@ async def suggest_topics(api_key: str):
     try:
         logger.info("🔍 Generating topic suggestions from PDF content")
         
-        # Sample up to 5 random chunks from the vector database for topic analysis
-        all_chunks = list(app.state.vector_db.vectors.keys())
-        sample_size = min(5, len(all_chunks))
+        # Sample up to 3 random chunks from the vector database for topic analysis
+        sample_chunks = reservoir_sample(app.state.vector_db.vectors.keys(), 3)
         
-        if sample_size == 0:
+        if not sample_chunks:
             return TopicSuggestionsResponse(suggestions=[], has_pdf=True)
         
-        # Get a representative sample of chunks
-        import random
-        random.seed(42)  # For consistent results
-        sample_chunks = random.sample(all_chunks, sample_size)
-        sample_text = "\n\n".join(sample_chunks[:3])  # Use first 3 for analysis
+        sample_text = "\n\n".join(sample_chunks)
         
         # Create prompt for topic suggestion
         suggestion_prompt = f"""Based on the following content from a PDF document, suggest exactly 2 specific, interesting questions that a user might want to ask about this document. 
@@ -419,30 +770,16 @@ Respond with ONLY a numbered list of exactly 2 questions, nothing else:"""
 
         logger.info("🤖 Generating topic suggestions using OpenAI")
         
-        # Set OpenAI API key
-        os.environ["OPENAI_API_KEY"] = api_key
-        
         # Generate suggestions using ChatOpenAI
-        chat_model = ChatOpenAI(model_name="gpt-4o-mini")
-        response = chat_model.run([{"role": "user", "content": suggestion_prompt}])
-        
-        # Parse the response to extract individual questions
-        suggestions = []
-        for line in response.split('\n'):
-            line = line.strip()
-            if line and (line[0].isdigit() or line.startswith('-') or line.startswith('•')):
-                # Remove numbering and clean up
-                clean_question = line
-                # Remove common prefixes
-                for prefix in ['1.', '2.', '-', '•']:
-                    if clean_question.startswith(prefix):
-                        clean_question = clean_question[len(prefix):].strip()
-                        break
-                if clean_question and len(clean_question) > 10:  # Ensure it's a real question
-                    suggestions.append(clean_question)
-        
-        # Limit to 2 suggestions maximum
-        suggestions = suggestions[:2]
+        chat_model = get_chat_model("gpt-4o-mini", api_key)
+        response = await chat_model.arun([{"role": "user", "content": suggestion_prompt}])
+        
+        # Parse the numbered/bulleted list items, limited to 2 suggestions maximum
+        suggestions = [
+            match.group(1)
+            for line in response.splitlines()
+            if (match := _LIST_ITEM_RE.match(line))
+        ][:2]
         
         logger.info(f"✅ Generated {len(suggestions)} topic suggestions")
         